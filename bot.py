@@ -1,23 +1,52 @@
+"""Discord bot that mirrors messages from allowed guilds into a single feed channel.
+
+Upgrading from a version that stored mapping _ids as strings: stop the bot and run
+``python migrate_mapping_ids.py`` once before starting it again.
+"""
+
 import asyncio
+import logging
 import sys
 import discord
 
 from config import load_settings
-from db import close_db, get_mapping_collection, init_db
-from handlers import handle_message, handle_message_delete, handle_message_edit, handle_raw_message_delete
+from db import close_db, get_mapping_collection, init_db, queue_mapping_write
+from handlers import (
+    flush_feed_deletes,
+    get_feed_channel,
+    handle_guild_channel_delete,
+    handle_guild_channel_update,
+    handle_message,
+    handle_message_edit,
+    handle_raw_bulk_message_delete,
+    handle_raw_message_delete,
+)
+from logging_config import configure_logging
 
 settings = load_settings()
+configure_logging(settings)
+log = logging.getLogger(__name__)
 
 intents = discord.Intents.default()
 intents.message_content = True
 client = discord.Client(intents=intents)
 
-feed_channel_cache: dict[int, discord.abc.GuildChannel] = {}
-
 
 @client.event
 async def on_ready():
-    print(f"Feed bot connected as {client.user}")
+    log.info("Feed bot connected as %s", client.user)
+    # Resolve the feed channel up front so the first mirrored message doesn't pay for it.
+    await get_feed_channel(client, settings.feed_channel_id)
+
+
+@client.event
+async def on_guild_channel_update(_before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+    handle_guild_channel_update(after)
+
+
+@client.event
+async def on_guild_channel_delete(channel: discord.abc.GuildChannel):
+    handle_guild_channel_delete(channel)
 
 
 @client.event
@@ -26,9 +55,9 @@ async def on_message(message: discord.Message):
         client=client,
         message=message,
         feed_channel_id=settings.feed_channel_id,
-        mapping_collection=get_mapping_collection(),
+        mapping_collection=await get_mapping_collection(),
+        queue_mapping_write=queue_mapping_write,
         allowed_guild_ids=settings.allowed_guild_ids,
-        feed_channel_cache=feed_channel_cache,
     )
 
 
@@ -39,40 +68,45 @@ async def on_message_edit(before: discord.Message, after: discord.Message):
         _before=before,
         after=after,
         feed_channel_id=settings.feed_channel_id,
-        mapping_collection=get_mapping_collection(),
+        mapping_collection=await get_mapping_collection(),
+        queue_mapping_write=queue_mapping_write,
         allowed_guild_ids=settings.allowed_guild_ids,
-        feed_channel_cache=feed_channel_cache,
     )
 
 
 @client.event
-async def on_message_delete(message: discord.Message):
-    await handle_message_delete(
+async def on_raw_message_delete(payload: discord.RawMessageDeleteEvent):
+    await handle_raw_message_delete(
         client=client,
-        message=message,
+        payload=payload,
         feed_channel_id=settings.feed_channel_id,
-        mapping_collection=get_mapping_collection(),
+        mapping_collection=await get_mapping_collection(),
+        queue_mapping_write=queue_mapping_write,
         allowed_guild_ids=settings.allowed_guild_ids,
-        feed_channel_cache=feed_channel_cache,
     )
 
 
 @client.event
-async def on_raw_message_delete(payload: discord.RawMessageDeleteEvent):
-    await handle_raw_message_delete(
+async def on_raw_bulk_message_delete(payload: discord.RawBulkMessageDeleteEvent):
+    await handle_raw_bulk_message_delete(
         client=client,
         payload=payload,
         feed_channel_id=settings.feed_channel_id,
-        mapping_collection=get_mapping_collection(),
+        mapping_collection=await get_mapping_collection(),
+        queue_mapping_write=queue_mapping_write,
         allowed_guild_ids=settings.allowed_guild_ids,
-        feed_channel_cache=feed_channel_cache,
     )
 
 
 async def main():
-    await init_db(settings)
     try:
-        await client.start(settings.token)
+        async with client:
+            try:
+                # Connect to MongoDB while logging in to Discord; a Mongo failure still stops the bot.
+                await asyncio.gather(init_db(settings), client.start(settings.token))
+            finally:
+                # Deletes are batched; send the rest while the HTTP session is still open.
+                await flush_feed_deletes(client)
     finally:
         await close_db()
 
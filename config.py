@@ -1,6 +1,9 @@
+from __future__ import annotations
+
 import os
 import sys
 from dataclasses import dataclass
+from pathlib import Path
 
 from dotenv import load_dotenv
 
@@ -12,47 +15,62 @@ class Settings:
     mongo_uri: str
     mongo_db_name: str
     mongo_collection_name: str
-    allowed_guild_ids: set[int]
+    allowed_guild_ids: frozenset[int]
+    log_file_path: str | None = None
+
+
+REQUIRED_ENV_VARS = (
+    "DISCORD_TOKEN",
+    "FEED_CHANNEL_ID",
+    "MONGO_URI",
+    "MONGO_DB",
+    "MONGO_COLLECTION",
+    "ALLOWED_GUILD_IDS",
+)
+
+_cached_settings: Settings | None = None
 
 
 def load_settings() -> Settings:
-    load_dotenv()
-
-    token = os.getenv("DISCORD_TOKEN")
-    feed_channel_id = os.getenv("FEED_CHANNEL_ID")
-    mongo_uri = os.getenv("MONGO_URI")
-    mongo_db_name = os.getenv("MONGO_DB")
-    mongo_collection_name = os.getenv("MONGO_COLLECTION")
-    allowed_guild_ids_raw = os.getenv("ALLOWED_GUILD_IDS")
-
-    if not token or not feed_channel_id or not mongo_uri or not mongo_db_name or not mongo_collection_name or not allowed_guild_ids_raw:
-        sys.exit(
-            "DISCORD_TOKEN, FEED_CHANNEL_ID, MONGO_URI, MONGO_DB, MONGO_COLLECTION, and ALLOWED_GUILD_IDS must be set"
-        )
+    global _cached_settings
+
+    if _cached_settings is not None:
+        return _cached_settings
+
+    # Deployments usually inject env vars directly; only read a .env file when one is present.
+    dotenv_path = Path(os.getenv("DOTENV_PATH") or Path(__file__).with_name(".env"))
+    if dotenv_path.is_file():
+        load_dotenv(dotenv_path)
+
+    env = {name: os.getenv(name) for name in REQUIRED_ENV_VARS}
+    missing = [name for name, value in env.items() if not value]
+    if missing:
+        sys.exit(f"Missing required environment variables: {', '.join(missing)}")
+
+    log_file_path = os.getenv("LOG_FILE") or None
 
     try:
-        feed_channel_id_int = int(feed_channel_id)
+        feed_channel_id_int = int(env["FEED_CHANNEL_ID"])
     except ValueError:
         sys.exit("FEED_CHANNEL_ID must be an integer")
 
-    allowed_guild_ids: set[int] = set()
-    for raw_id in allowed_guild_ids_raw.split(","):
-        guild_id = raw_id.strip()
-        if not guild_id:
-            continue
-        try:
-            allowed_guild_ids.add(int(guild_id))
-        except ValueError:
-            sys.exit("ALLOWED_GUILD_IDS must contain only integers (comma-separated)")
+    try:
+        allowed_guild_ids = frozenset(
+            int(raw_id) for raw_id in map(str.strip, env["ALLOWED_GUILD_IDS"].split(",")) if raw_id
+        )
+    except ValueError:
+        sys.exit("ALLOWED_GUILD_IDS must contain only integers (comma-separated)")
 
     if not allowed_guild_ids:
         sys.exit("ALLOWED_GUILD_IDS must include at least one guild id")
 
-    return Settings(
-        token=token,
+    _cached_settings = Settings(
+        token=env["DISCORD_TOKEN"],
         feed_channel_id=feed_channel_id_int,
-        mongo_uri=mongo_uri,
-        mongo_db_name=mongo_db_name,
-        mongo_collection_name=mongo_collection_name,
+        mongo_uri=env["MONGO_URI"],
+        mongo_db_name=env["MONGO_DB"],
+        mongo_collection_name=env["MONGO_COLLECTION"],
         allowed_guild_ids=allowed_guild_ids,
+        log_file_path=log_file_path,
     )
+    return _cached_settings
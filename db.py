@@ -1,48 +1,181 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 from typing import Optional
 
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+from pymongo.errors import BulkWriteError
+from pymongo.operations import DeleteOne, UpdateOne
 
 from config import Settings
 
+log = logging.getLogger(__name__)
+
 mongo_client: Optional[AsyncIOMotorClient] = None
 mapping_collection: Optional[AsyncIOMotorCollection] = None
+_settings: Optional[Settings] = None
+_init_lock = asyncio.Lock()
+
+# Mapping writes that can lag behind the send are batched into one bulk_write.
+MAPPING_WRITE_BATCH_SIZE = 100
+MAPPING_WRITE_INTERVAL_SECONDS = 0.05
+# Failed writes are retried a few times so a Mongo blip doesn't leave reservations without a feed id.
+MAPPING_WRITE_MAX_ATTEMPTS = 5
+MAPPING_WRITE_RETRY_DELAY_SECONDS = 1.0
+# Each queued write with the number of times it has already been attempted.
+_pending_mapping_writes: list[tuple[UpdateOne | DeleteOne, int]] = []
+_mapping_writes_wakeup: Optional[asyncio.Event] = None
+_mapping_writer_task: Optional[asyncio.Task] = None
 
 
 async def init_db(settings: Settings) -> None:
     """Initialize the Mongo client and mapping collection once."""
-    global mongo_client, mapping_collection
+    global _settings
+
+    _settings = settings
+    await _ensure_db()
+
 
+async def _ensure_db() -> None:
+    # Double-checked so concurrent callers share a single connection attempt.
     if mongo_client is not None:
         return
 
+    async with _init_lock:
+        if mongo_client is not None:
+            return
+        if _settings is None:
+            raise RuntimeError("MongoDB is not configured")
+        await _connect(_settings)
+
+
+async def _connect(settings: Settings) -> None:
+    global mongo_client, mapping_collection, _mapping_writes_wakeup, _mapping_writer_task
+
     client = AsyncIOMotorClient(
         settings.mongo_uri,
         # Fail fast if the MongoDB service is unavailable.
         serverSelectionTimeoutMS=5000,
+        # A single asyncio process never needs the default pool of 100 connections.
+        maxPoolSize=20,
+        minPoolSize=2,
+        maxIdleTimeMS=60000,
+        # Negotiated with the server; falls back to the next entry or none if unsupported.
+        compressors="zstd,zlib",
     )
     db = client[settings.mongo_db_name]
     collection = db[settings.mongo_collection_name]
 
     try:
         await client.admin.command("ping")
+        # Mappings written before _id became an int64 snowflake are invisible to lookups until migrated.
+        legacy_mapping = await collection.find_one({"_id": {"$type": "string"}}, {"_id": 1})
     except Exception:
         client.close()
         raise
+    if legacy_mapping is not None:
+        log.warning(
+            "Collection %s still has mappings with string _ids; stop the bot and run "
+            "'python migrate_mapping_ids.py' or edits and deletes of older messages won't reach the feed",
+            settings.mongo_collection_name,
+        )
 
     mongo_client = client
     mapping_collection = collection
 
+    _mapping_writes_wakeup = asyncio.Event()
+    _mapping_writer_task = asyncio.create_task(_run_mapping_writer())
+
 
-def get_mapping_collection() -> AsyncIOMotorCollection:
+async def get_mapping_collection() -> AsyncIOMotorCollection:
     if mapping_collection is None:
-        raise RuntimeError("MongoDB is not initialized")
+        # Events can arrive while init_db is still connecting; wait for it rather than failing.
+        await _ensure_db()
     return mapping_collection
 
 
+def queue_mapping_write(operation: UpdateOne | DeleteOne) -> None:
+    """Queue a mapping write for the next batched bulk_write."""
+    _pending_mapping_writes.append((operation, 0))
+    if _mapping_writes_wakeup is not None and (
+        len(_pending_mapping_writes) == 1 or len(_pending_mapping_writes) >= MAPPING_WRITE_BATCH_SIZE
+    ):
+        _mapping_writes_wakeup.set()
+
+
+async def flush_mapping_writes() -> bool:
+    """Write the queued mapping updates; return True if any failed and were re-queued."""
+    global _pending_mapping_writes
+
+    if not _pending_mapping_writes or mapping_collection is None:
+        return False
+
+    batch, _pending_mapping_writes = _pending_mapping_writes, []
+    try:
+        await mapping_collection.bulk_write([operation for operation, _ in batch], ordered=False)
+    except asyncio.CancelledError:
+        # close_db cancelled the writer mid-write; put the batch back so its final flush retries it.
+        _pending_mapping_writes = batch + _pending_mapping_writes
+        raise
+    except BulkWriteError as exc:
+        # Ops listed in writeErrors were rejected by the server and would fail again; retry the rest.
+        rejected = {error["index"] for error in exc.details.get("writeErrors", [])}
+        if rejected:
+            log.error("Dropped %d mapping updates rejected by MongoDB: %s", len(rejected), exc.details["writeErrors"])
+        return _requeue_mapping_writes([entry for index, entry in enumerate(batch) if index not in rejected])
+    except Exception as exc:  # noqa: BLE001
+        log.warning("Failed to write %d queued mapping updates, will retry: %s", len(batch), exc)
+        return _requeue_mapping_writes(batch)
+    return False
+
+
+def _requeue_mapping_writes(entries: list[tuple[UpdateOne | DeleteOne, int]]) -> bool:
+    global _pending_mapping_writes
+
+    retry = [(operation, attempts + 1) for operation, attempts in entries if attempts + 1 < MAPPING_WRITE_MAX_ATTEMPTS]
+    if len(retry) < len(entries):
+        log.error(
+            "Giving up on %d mapping updates after %d attempts", len(entries) - len(retry), MAPPING_WRITE_MAX_ATTEMPTS
+        )
+    # Keep them ahead of newer writes so a later update to the same mapping still lands last.
+    _pending_mapping_writes = retry + _pending_mapping_writes
+    return bool(retry)
+
+
+async def _run_mapping_writer() -> None:
+    while True:
+        await _mapping_writes_wakeup.wait()
+        _mapping_writes_wakeup.clear()
+        if len(_pending_mapping_writes) < MAPPING_WRITE_BATCH_SIZE:
+            # Give a burst a moment to accumulate; a full batch wakes us early.
+            try:
+                await asyncio.wait_for(_mapping_writes_wakeup.wait(), timeout=MAPPING_WRITE_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            _mapping_writes_wakeup.clear()
+        if await flush_mapping_writes():
+            # Back off before retrying; the queue is no longer empty, so new writes won't wake us.
+            await asyncio.sleep(MAPPING_WRITE_RETRY_DELAY_SECONDS)
+            _mapping_writes_wakeup.set()
+
+
 async def close_db() -> None:
-    global mongo_client, mapping_collection
+    global mongo_client, mapping_collection, _mapping_writes_wakeup, _mapping_writer_task
+
+    if _mapping_writer_task is not None:
+        _mapping_writer_task.cancel()
+        try:
+            await _mapping_writer_task
+        except asyncio.CancelledError:
+            pass
+        _mapping_writer_task = None
+        _mapping_writes_wakeup = None
+
+    await flush_mapping_writes()
+    if _pending_mapping_writes:
+        log.error("Dropping %d mapping updates that could not be written before shutdown", len(_pending_mapping_writes))
+        _pending_mapping_writes.clear()
 
     if mongo_client is not None:
         mongo_client.close()
@@ -1,60 +1,94 @@
 from __future__ import annotations
 
+import asyncio
+import datetime
 import io
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable, Union
 
 import discord
+from discord.http import handle_message_parameters
+from discord.utils import MISSING
 from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import DuplicateKeyError
+from pymongo.operations import DeleteOne, UpdateOne
 
+log = logging.getLogger(__name__)
 AllowedMentions = discord.AllowedMentions(users=False, roles=False, everyone=False, replied_user=False)
-_last_feed_state: dict[str, int] | None = None
-
-
-def is_allowed_guild(guild_id: int | None, allowed_guild_ids: set[int]) -> bool:
-    return guild_id is not None and guild_id in allowed_guild_ids
+# Queues a write against the handler's mapping collection; db.queue_mapping_write in the bot.
+MappingWriteQueue = Callable[[Union[UpdateOne, DeleteOne]], None]
+# Handlers only ever need the feed message id and header flag back from a mapping lookup.
+MappingProjection = {"feed_message_id": 1, "has_header": 1}
+_last_feed_state: tuple[int, int] | None = None  # (source_channel_id, author_id)
+
+# Recently mirrored source message id -> (feed message id, has_header), so replies and edits skip Mongo.
+# has_header is None for mappings stored before the flag was recorded.
+_MAPPING_CACHE_MAX = 10_000
+_mapping_cache: OrderedDict[int, tuple[int, bool | None]] = OrderedDict()
+
+# Resolved feed channel objects with their expiry (monotonic seconds), shared by every handler.
+_FEED_CHANNEL_CACHE_MAX = 256
+_FEED_CHANNEL_CACHE_TTL_SECONDS = 3600.0
+_feed_channel_cache: dict[int, tuple[discord.abc.GuildChannel, float]] = {}
+
+# Feed deletions are coalesced briefly so a moderator purge becomes a few bulk deletes.
+_FEED_DELETE_DELAY_SECONDS = 0.1
+_BULK_DELETE_MAX = 100
+_BULK_DELETE_MAX_AGE = datetime.timedelta(days=14)
+_pending_feed_deletes: dict[int, set[int]] = {}
+_feed_delete_task: asyncio.Task | None = None
+# Channels where a bulk delete came back 403 and permissions can't be read from the cache.
+_bulk_delete_forbidden: set[int] = set()
+
+# Cap parallel CDN downloads so large multi-attachment posts don't spike memory.
+_ATTACHMENT_DOWNLOAD_CONCURRENCY = 4
 
 
 def _should_include_header(source_channel_id: int, author_id: int, is_reply: bool) -> bool:
     # Replies always render a header regardless of block/grouping.
-    if is_reply:
-        return True
-
-    if _last_feed_state is None:
-        return True
-
-    return (
-        _last_feed_state.get("source_channel_id") != source_channel_id
-        or _last_feed_state.get("author_id") != author_id
-    )
+    return is_reply or _last_feed_state != (source_channel_id, author_id)
 
 
 def _update_last_feed_state(source_channel_id: int, author_id: int) -> None:
     global _last_feed_state
-    _last_feed_state = {"author_id": author_id, "source_channel_id": source_channel_id}
+    _last_feed_state = (source_channel_id, author_id)
+
+
+def _cache_put(source_message_id: int, feed_message_id: int, has_header: bool | None) -> None:
+    _mapping_cache[source_message_id] = (feed_message_id, has_header)
+    _mapping_cache.move_to_end(source_message_id)
+    if len(_mapping_cache) > _MAPPING_CACHE_MAX:
+        _mapping_cache.popitem(last=False)
+
+
+def _cache_get(source_message_id: int) -> tuple[int, bool | None] | None:
+    mapping = _mapping_cache.get(source_message_id)
+    if mapping is not None:
+        _mapping_cache.move_to_end(source_message_id)
+    return mapping
 
 
 def build_content(message: discord.Message, include_header: bool) -> str | None:
+    # Follow-ups in a grouped block are just the body; skip the header assembly entirely.
+    if not include_header:
+        return message.content or None
+
     # Prefer the author's display name when available, but keep a mention for clarity.
-    parts: list[str] = []
-    if include_header:
-        if getattr(message.author, "bot", False):
-            author_header = None
+    if getattr(message.author, "bot", False):
+        author_header = None
+    else:
+        display_name = getattr(message.author, "display_name", None)
+        if display_name:
+            author_header = f"**⬥ {display_name}**"
         else:
-            display_name = getattr(message.author, "display_name", None)
-            if display_name:
-                author_header = f"**⬥ {display_name}**"
-            else:
-                author_header = "**⬥ Unknown User**"
-
-        header = f"-# {author_header} |{message.jump_url}" if author_header else f"-# 🔗 {message.jump_url}"
-        parts.append(header)
+            author_header = "**⬥ Unknown User**"
 
+    header = f"-# {author_header} |{message.jump_url}" if author_header else f"-# 🔗 {message.jump_url}"
     if message.content:
-        parts.append(message.content)
-
-    if not parts:
-        return None
-
-    return "\n".join(parts)
+        return f"{header}\n{message.content}"
+    return header
 
 
 async def _sticker_to_file(sticker: discord.StickerItem) -> discord.File | None:
@@ -62,10 +96,10 @@ async def _sticker_to_file(sticker: discord.StickerItem) -> discord.File | None:
         content = await sticker.read()
     except TypeError:
         # Lottie stickers cannot be rendered as files; skip them.
-        print(f"Skipping unsupported lottie sticker: {sticker.name} ({sticker.id})")
+        log.info("Skipping unsupported lottie sticker: %s (%s)", sticker.name, sticker.id)
         return None
     except Exception as exc:  # noqa: BLE001
-        print(f"Failed to download sticker {sticker.id}: {exc}")
+        log.warning("Failed to download sticker %s: %s", sticker.id, exc)
         return None
 
     filename = f"sticker-{sticker.id}.{sticker.format.file_extension}"
@@ -73,136 +107,215 @@ async def _sticker_to_file(sticker: discord.StickerItem) -> discord.File | None:
 
 
 async def build_attachment_files(message: discord.Message) -> list[discord.File]:
+    if not message.attachments:
+        return []
+
+    semaphore = asyncio.Semaphore(_ATTACHMENT_DOWNLOAD_CONCURRENCY)
+
+    async def download(attachment: discord.Attachment) -> discord.File:
+        async with semaphore:
+            return await attachment.to_file()
+
+    results = await asyncio.gather(*(download(a) for a in message.attachments), return_exceptions=True)
     files: list[discord.File] = []
-    for attachment in message.attachments:
-        files.append(await attachment.to_file())
+    for attachment, result in zip(message.attachments, results):
+        if isinstance(result, BaseException):
+            # Mirror what we could download rather than dropping the whole message.
+            log.warning("Failed to download attachment %s from message %s: %s", attachment.id, message.id, result)
+            continue
+        files.append(result)
 
     return files
 
 
-async def get_feed_channel(
-    client: discord.Client, feed_channel_id: int, feed_channel_cache: dict[int, discord.abc.GuildChannel]
-) -> discord.abc.GuildChannel | None:
-    channel = feed_channel_cache.get(feed_channel_id)
-    if channel:
-        return channel
+def _rewind_files(files: list[discord.File]) -> None:
+    # A failed send has already consumed the streams; rewind them so a retry uploads the full data.
+    for f in files:
+        f.reset(seek=True)
+
+
+async def _send_feed_message(
+    client: discord.Client,
+    channel_id: int,
+    content: str | None,
+    files: list[discord.File],
+    stickers: list[discord.StickerItem],
+    reference: discord.MessageReference | None,
+) -> int:
+    # Only the new message id is needed, so post through the HTTP client and skip building a Message.
+    with handle_message_parameters(
+        content=MISSING if content is None else content,
+        files=files or MISSING,
+        allowed_mentions=AllowedMentions,
+        message_reference=reference.to_message_reference_dict() if reference else MISSING,
+        stickers=[sticker.id for sticker in stickers] if stickers else MISSING,
+        previous_allowed_mentions=client.allowed_mentions,
+    ) as params:
+        data = await client.http.send_message(channel_id, params=params)
+    return int(data["id"])
+
+
+async def _edit_feed_message(client: discord.Client, channel_id: int, message_id: int, content: str | None) -> None:
+    with handle_message_parameters(
+        content=content,
+        allowed_mentions=AllowedMentions,
+        previous_allowed_mentions=client.allowed_mentions,
+    ) as params:
+        await client.http.edit_message(channel_id, message_id, params=params)
+
+
+async def get_feed_channel(client: discord.Client, feed_channel_id: int) -> discord.abc.GuildChannel | None:
+    now = time.monotonic()
+    cached = _feed_channel_cache.get(feed_channel_id)
+    if cached and cached[1] > now:
+        return cached[0]
 
+    # Revalidate against the gateway cache first; only fall back to REST when it has nothing.
     channel = client.get_channel(feed_channel_id)
     if channel is None:
         try:
             channel = await client.fetch_channel(feed_channel_id)
         except Exception as exc:
-            print(f"Failed to fetch feed channel: {exc}")
+            log.warning("Failed to fetch feed channel: %s", exc)
             return None
 
-    feed_channel_cache[feed_channel_id] = channel
+    _remember_feed_channel(channel, now)
     return channel
 
 
+def _remember_feed_channel(channel: discord.abc.GuildChannel, now: float) -> None:
+    _feed_channel_cache.pop(channel.id, None)
+    _feed_channel_cache[channel.id] = (channel, now + _FEED_CHANNEL_CACHE_TTL_SECONDS)
+    if len(_feed_channel_cache) > _FEED_CHANNEL_CACHE_MAX:
+        del _feed_channel_cache[next(iter(_feed_channel_cache))]
+
+
+def handle_guild_channel_update(after: discord.abc.GuildChannel) -> None:
+    if after.id in _feed_channel_cache:
+        _remember_feed_channel(after, time.monotonic())
+
+
+def handle_guild_channel_delete(channel: discord.abc.GuildChannel) -> None:
+    _feed_channel_cache.pop(channel.id, None)
+
+
+async def _lookup_mapping(
+    mapping_collection: AsyncIOMotorCollection, source_message_id: int | None
+) -> tuple[int, bool | None] | None:
+    if source_message_id is None:
+        return None
+
+    mapping = _cache_get(source_message_id)
+    if mapping is None:
+        stored = await mapping_collection.find_one({"_id": source_message_id}, MappingProjection)
+        if stored and stored.get("feed_message_id"):
+            mapping = (stored["feed_message_id"], stored.get("has_header"))
+            _cache_put(source_message_id, *mapping)
+
+    return mapping
+
+
 async def handle_message(
     client: discord.Client,
     message: discord.Message,
     feed_channel_id: int,
     mapping_collection: AsyncIOMotorCollection,
-    allowed_guild_ids: set[int],
-    feed_channel_cache: dict[int, discord.abc.GuildChannel],
+    queue_mapping_write: MappingWriteQueue,
+    allowed_guild_ids: frozenset[int],
 ) -> None:
-    if not is_allowed_guild(getattr(message.guild, "id", None), allowed_guild_ids):
+    guild = message.guild
+    if guild is None or guild.id not in allowed_guild_ids:
         return
 
     # Skip the feed bot itself and the feed channel to avoid loops.
     if (client.user and message.author.id == client.user.id) or message.channel.id == feed_channel_id:
         return
 
-    feed_channel = await get_feed_channel(client, feed_channel_id, feed_channel_cache)
-    if feed_channel is None:
+    is_reply = bool(message.reference and message.reference.message_id)
+    parent_source_id = message.reference.message_id if is_reply else None
+
+    # Resolve the feed channel, reserve the mapping, and look up the reply parent concurrently.
+    # The reservation lets duplicate deliveries bail out before any downloads or sends.
+    results = await asyncio.gather(
+        get_feed_channel(client, feed_channel_id),
+        mapping_collection.insert_one({"_id": message.id}),
+        _lookup_mapping(mapping_collection, parent_source_id),
+        return_exceptions=True,
+    )
+    feed_channel, reservation, parent_mapping = results
+    # A duplicate key means another delivery of this message already claimed it.
+    reserved = not isinstance(reservation, BaseException)
+    error = next(
+        (result for result in results if isinstance(result, BaseException) and not isinstance(result, DuplicateKeyError)),
+        None,
+    )
+    if error is not None or feed_channel is None or not reserved:
+        if reserved:
+            await mapping_collection.delete_one({"_id": message.id})
+        if error is not None:
+            raise error
         return
 
     files: list[discord.File] = []
     fallback_sticker_files: list[discord.File] = []
     stickers = list(message.stickers)
-    is_reply = bool(message.reference and message.reference.message_id)
+    mirrored = False
     try:
         files = await build_attachment_files(message)
 
         include_header = _should_include_header(message.channel.id, message.author.id, is_reply=is_reply)
 
         parent_reference = None
-        if is_reply:
-            parent_source_id = message.reference.message_id
-            parent_mapping = await mapping_collection.find_one({"_id": str(parent_source_id)})
-            if parent_mapping:
-                try:
-                    parent_reference = await feed_channel.fetch_message(parent_mapping["feed_message_id"])
-                except discord.NotFound:
-                    parent_reference = None
-                except discord.HTTPException as exc:
-                    print(
-                        f"Failed to fetch parent feed message for {message.id} "
-                        f"(reply target {parent_mapping['feed_message_id']}): {exc}"
-                    )
-                    parent_reference = None
-
-        existing_mapping = await mapping_collection.find_one({"_id": str(message.id)})
-        if existing_mapping:
-            return
+        if parent_mapping is not None:
+            # No need to fetch the parent; Discord posts without the reply if it no longer exists.
+            parent_reference = discord.MessageReference(
+                message_id=parent_mapping[0],
+                channel_id=feed_channel.id,
+                fail_if_not_exists=False,
+            )
 
         content = build_content(message, include_header=include_header)
-        send_kwargs = {
-            "files": files,
-            "allowed_mentions": AllowedMentions,
-            "reference": parent_reference,
-        }
-        if content is not None:
-            send_kwargs["content"] = content
-        if stickers:
-            send_kwargs["stickers"] = stickers
-
         try:
-            feed_message = await feed_channel.send(**send_kwargs)
+            feed_message_id = await _send_feed_message(client, feed_channel.id, content, files, stickers, parent_reference)
         except discord.HTTPException as exc:
+            feed_message_id = None
             # If Discord rejects the reply reference (e.g., deleted/invalid parent), retry without it once.
-            if send_kwargs.get("reference"):
-                send_kwargs["reference"] = None
+            if parent_reference is not None:
+                _rewind_files(files)
                 try:
-                    feed_message = await feed_channel.send(**send_kwargs)
+                    feed_message_id = await _send_feed_message(client, feed_channel.id, content, files, stickers, None)
                 except discord.HTTPException as retry_exc:
                     exc = retry_exc
-                else:
-                    _update_last_feed_state(source_channel_id=message.channel.id, author_id=message.author.id)
-                    await mapping_collection.insert_one(
-                        {
-                            "_id": str(message.id),
-                            "source_message_id": message.id,
-                            "feed_message_id": feed_message.id,
-                        }
-                    )
-                    return
-
-            # If stickers failed (e.g., missing permissions), fall back to mirroring as files.
-            if stickers:
-                for sticker in stickers:
-                    sticker_file = await _sticker_to_file(sticker)
-                    if sticker_file:
-                        fallback_sticker_files.append(sticker_file)
-
-            if not fallback_sticker_files:
-                print(f"Failed to mirror message {message.id}: {exc}")
-                raise
-
-            send_kwargs.pop("stickers", None)
-            send_kwargs["files"] = [*files, *fallback_sticker_files]
-            feed_message = await feed_channel.send(**send_kwargs)
 
+            if feed_message_id is None:
+                # If stickers failed (e.g., missing permissions), fall back to mirroring as files.
+                if stickers:
+                    sticker_files = await asyncio.gather(*(_sticker_to_file(sticker) for sticker in stickers))
+                    fallback_sticker_files.extend(f for f in sticker_files if f)
+
+                if not fallback_sticker_files:
+                    log.warning("Failed to mirror message %s: %s", message.id, exc)
+                    raise
+
+                _rewind_files(files)
+                feed_message_id = await _send_feed_message(
+                    client, feed_channel.id, content, [*files, *fallback_sticker_files], [], None
+                )
+
+        mirrored = True
         _update_last_feed_state(source_channel_id=message.channel.id, author_id=message.author.id)
-        await mapping_collection.insert_one(
-            {
-                "_id": str(message.id),
-                "source_message_id": message.id,
-                "feed_message_id": feed_message.id,
-            }
+        # The cache covers lookups until the queued write lands in Mongo.
+        _cache_put(message.id, feed_message_id, include_header)
+        queue_mapping_write(
+            UpdateOne(
+                {"_id": message.id},
+                {"$set": {"feed_message_id": feed_message_id, "has_header": include_header}},
+            )
         )
     finally:
+        if not mirrored:
+            # Release the reservation so a redelivery of this message can try again.
+            await mapping_collection.delete_one({"_id": message.id})
         for f in [*files, *fallback_sticker_files]:
             try:
                 f.close()
@@ -216,68 +329,143 @@ async def handle_message_edit(
     after: discord.Message,
     feed_channel_id: int,
     mapping_collection: AsyncIOMotorCollection,
-    allowed_guild_ids: set[int],
-    feed_channel_cache: dict[int, discord.abc.GuildChannel],
+    queue_mapping_write: MappingWriteQueue,
+    allowed_guild_ids: frozenset[int],
 ) -> None:
-    if not is_allowed_guild(getattr(after.guild, "id", None), allowed_guild_ids):
+    guild = after.guild
+    if guild is None or guild.id not in allowed_guild_ids:
         return
 
     if (client.user and after.author.id == client.user.id) or after.channel.id == feed_channel_id:
         return
 
-    mapping = await mapping_collection.find_one({"_id": str(after.id)})
-    if not mapping:
+    mapping = await _lookup_mapping(mapping_collection, after.id)
+    if mapping is None:
         return
 
-    feed_channel = await get_feed_channel(client, feed_channel_id, feed_channel_cache)
+    feed_channel = await get_feed_channel(client, feed_channel_id)
     if feed_channel is None:
         return
 
+    feed_message_id, include_header = mapping
+    if include_header is None:
+        # Older mappings don't record the header flag; read it back from the mirrored message.
+        try:
+            feed_message = await feed_channel.fetch_message(feed_message_id)
+        except discord.NotFound:
+            return
+        include_header = feed_message.content.startswith("-# ") if feed_message.content else False
+        # Record the flag so later edits of this message skip the fetch.
+        _cache_put(after.id, feed_message_id, include_header)
+        queue_mapping_write(UpdateOne({"_id": after.id}, {"$set": {"has_header": include_header}}))
+
     try:
-        feed_message = await feed_channel.fetch_message(mapping["feed_message_id"])
+        await _edit_feed_message(
+            client, feed_channel.id, feed_message_id, content=build_content(after, include_header=include_header)
+        )
     except discord.NotFound:
         return
 
-    include_header = feed_message.content.startswith("-# ") if feed_message.content else False
-    await feed_message.edit(
-        content=build_content(after, include_header=include_header),
-        allowed_mentions=AllowedMentions,
-    )
+
+def _queue_feed_delete(client: discord.Client, channel_id: int, message_id: int) -> None:
+    global _feed_delete_task
+
+    _pending_feed_deletes.setdefault(channel_id, set()).add(message_id)
+    if _feed_delete_task is None or _feed_delete_task.done():
+        _feed_delete_task = asyncio.create_task(_flush_feed_deletes(client))
+
+
+async def flush_feed_deletes(client: discord.Client) -> None:
+    """Send every queued feed delete; call before the client's HTTP session closes."""
+    if _feed_delete_task is not None and not _feed_delete_task.done():
+        await asyncio.wait({_feed_delete_task})
+    await _flush_feed_deletes(client)
 
 
-async def handle_message_delete(
+async def _flush_feed_deletes(client: discord.Client) -> None:
+    while _pending_feed_deletes:
+        await asyncio.sleep(_FEED_DELETE_DELAY_SECONDS)
+        pending = dict(_pending_feed_deletes)
+        _pending_feed_deletes.clear()
+        for channel_id, message_ids in pending.items():
+            try:
+                await _delete_feed_messages(client, channel_id, sorted(message_ids))
+            except Exception as exc:  # noqa: BLE001
+                # Keep going so one channel's failure doesn't drop every other queued delete.
+                log.exception("Failed to delete %d mirrored messages in %s: %s", len(message_ids), channel_id, exc)
+
+
+def _can_bulk_delete(client: discord.Client, channel_id: int) -> bool:
+    # Bulk delete needs Manage Messages even for the bot's own posts; single deletes don't.
+    cached = _feed_channel_cache.get(channel_id)
+    channel = cached[0] if cached else client.get_channel(channel_id)
+    me = getattr(getattr(channel, "guild", None), "me", None)
+    if me is None:
+        return channel_id not in _bulk_delete_forbidden
+    return channel.permissions_for(me).manage_messages
+
+
+async def _delete_feed_messages(client: discord.Client, channel_id: int, message_ids: list[int]) -> None:
+    # Discord only bulk-deletes 2-100 messages at a time, and only ones younger than 14 days.
+    cutoff = discord.utils.utcnow() - _BULK_DELETE_MAX_AGE
+    bulk_allowed = _can_bulk_delete(client, channel_id)
+    recent: list[int] = []
+    one_by_one: list[int] = []
+    for message_id in message_ids:
+        if bulk_allowed and discord.utils.snowflake_time(message_id) > cutoff:
+            recent.append(message_id)
+        else:
+            one_by_one.append(message_id)
+
+    for start in range(0, len(recent), _BULK_DELETE_MAX):
+        batch = recent[start : start + _BULK_DELETE_MAX]
+        if len(batch) < 2:
+            one_by_one.extend(batch)
+            continue
+        try:
+            await client.http.delete_messages(channel_id, batch, reason="Source deleted")
+        except discord.Forbidden as exc:
+            log.warning("Bulk delete forbidden in %s, deleting one by one from now on: %s", channel_id, exc)
+            _bulk_delete_forbidden.add(channel_id)
+            one_by_one.extend(recent[start:])
+            break
+        except Exception as exc:  # noqa: BLE001
+            # Bulk delete rejects the whole batch on any bad id; network errors land here too,
+            # and the one-by-one path still gets a chance.
+            log.warning("Bulk delete of %d mirrored messages failed, deleting one by one: %s", len(batch), exc)
+            one_by_one.extend(batch)
+
+    for message_id in one_by_one:
+        try:
+            await client.http.delete_message(channel_id, message_id, reason="Source deleted")
+        except discord.NotFound:
+            pass
+        except discord.Forbidden as exc:
+            log.warning("Failed to delete mirrored message (forbidden): %s", exc)
+        except Exception as exc:
+            log.exception("Failed to delete mirrored message: %s", exc)
+
+
+async def _delete_mirror(
     client: discord.Client,
-    message: discord.Message,
     feed_channel_id: int,
     mapping_collection: AsyncIOMotorCollection,
-    allowed_guild_ids: set[int],
-    feed_channel_cache: dict[int, discord.abc.GuildChannel],
+    queue_mapping_write: MappingWriteQueue,
+    source_message_id: int,
 ) -> None:
-    if not is_allowed_guild(getattr(message.guild, "id", None), allowed_guild_ids):
-        return
-
-    if message.channel.id == feed_channel_id or (client.user and message.author and message.author.id == client.user.id):
-        return
-
-    mapping = await mapping_collection.find_one({"_id": str(message.id)})
-    if not mapping:
-        return
-
-    feed_channel = await get_feed_channel(client, feed_channel_id, feed_channel_cache)
-    if feed_channel is None:
-        return
+    cached = _mapping_cache.pop(source_message_id, None)
+    if cached is not None:
+        feed_message_id = cached[0]
+    else:
+        mapping = await mapping_collection.find_one({"_id": source_message_id}, MappingProjection)
+        if not mapping:
+            return
+        feed_message_id = mapping.get("feed_message_id")
 
-    feed_message_id = mapping["feed_message_id"]
-    try:
-        await client.http.delete_message(feed_channel.id, feed_message_id, reason="Source deleted")
-    except discord.NotFound:
-        pass
-    except discord.Forbidden as exc:
-        print(f"Failed to delete mirrored message (forbidden): {exc}")
-    except Exception as exc:
-        print(f"Failed to delete mirrored message: {exc}")
-    finally:
-        await mapping_collection.delete_one({"_id": str(message.id)})
+    # A mapping without a feed message id is still being mirrored; dropping it is all we can do.
+    if feed_message_id is not None:
+        _queue_feed_delete(client, feed_channel_id, feed_message_id)
+    queue_mapping_write(DeleteOne({"_id": source_message_id}))
 
 
 async def handle_raw_message_delete(
@@ -285,32 +473,38 @@ async def handle_raw_message_delete(
     payload: discord.RawMessageDeleteEvent,
     feed_channel_id: int,
     mapping_collection: AsyncIOMotorCollection,
-    allowed_guild_ids: set[int],
-    feed_channel_cache: dict[int, discord.abc.GuildChannel],
+    queue_mapping_write: MappingWriteQueue,
+    allowed_guild_ids: frozenset[int],
 ) -> None:
-    if not is_allowed_guild(payload.guild_id, allowed_guild_ids):
+    # Fires for cached and uncached messages alike, so it is the only single-delete path.
+    if payload.guild_id not in allowed_guild_ids:
         return
 
     # Skip deletions that happen inside the feed channel.
     if payload.channel_id == feed_channel_id:
         return
 
-    mapping = await mapping_collection.find_one({"_id": str(payload.message_id)})
-    if not mapping:
+    await _delete_mirror(client, feed_channel_id, mapping_collection, queue_mapping_write, payload.message_id)
+
+
+async def handle_raw_bulk_message_delete(
+    client: discord.Client,
+    payload: discord.RawBulkMessageDeleteEvent,
+    feed_channel_id: int,
+    mapping_collection: AsyncIOMotorCollection,
+    queue_mapping_write: MappingWriteQueue,
+    allowed_guild_ids: frozenset[int],
+) -> None:
+    # A moderator purge arrives as one event; queue every mirror delete together so they coalesce.
+    if payload.guild_id not in allowed_guild_ids:
         return
 
-    feed_channel = await get_feed_channel(client, feed_channel_id, feed_channel_cache)
-    if feed_channel is None:
+    if payload.channel_id == feed_channel_id:
         return
 
-    feed_message_id = mapping["feed_message_id"]
-    try:
-        await client.http.delete_message(feed_channel.id, feed_message_id, reason="Source deleted")
-    except discord.NotFound:
-        pass
-    except discord.Forbidden as exc:
-        print(f"Failed to delete mirrored message (forbidden): {exc}")
-    except Exception as exc:
-        print(f"Failed to delete mirrored message: {exc}")
-    finally:
-        await mapping_collection.delete_one({"_id": str(payload.message_id)})
+    await asyncio.gather(
+        *(
+            _delete_mirror(client, feed_channel_id, mapping_collection, queue_mapping_write, message_id)
+            for message_id in payload.message_ids
+        )
+    )
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from config import Settings
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+_listener: QueueListener | None = None
+
+
+def configure_logging(settings: Settings) -> None:
+    """Configure the root logger once for the bot and discord.py.
+
+    Records are only enqueued on the event loop; a listener thread does the console and file I/O.
+    """
+    global _listener
+
+    if _listener is not None:
+        return
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers: list[logging.Handler] = [logging.StreamHandler()]
+    if settings.log_file_path:
+        handlers.append(
+            RotatingFileHandler(settings.log_file_path, maxBytes=5 * 1024 * 1024, backupCount=3, encoding="utf-8")
+        )
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    # Drain anything still queued when the process exits.
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(QueueHandler(log_queue))
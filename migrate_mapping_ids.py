@@ -0,0 +1,37 @@
+"""One-off migration: rewrite mapping _ids stored as strings to int64 snowflakes.
+
+Run once with the bot stopped: python migrate_mapping_ids.py
+"""
+
+import asyncio
+
+from pymongo.errors import DuplicateKeyError
+
+from config import load_settings
+from db import close_db, get_mapping_collection, init_db
+
+
+async def migrate() -> int:
+    await init_db(load_settings())
+    migrated = 0
+    try:
+        collection = await get_mapping_collection()
+        async for doc in collection.find({"_id": {"$type": "string"}}):
+            legacy_id = doc.pop("_id")
+            doc.pop("source_message_id", None)
+            doc["_id"] = int(legacy_id)
+            try:
+                await collection.insert_one(doc)
+            except DuplicateKeyError:
+                # Already copied by an earlier, interrupted run.
+                pass
+            await collection.delete_one({"_id": legacy_id})
+            migrated += 1
+    finally:
+        await close_db()
+
+    return migrated
+
+
+if __name__ == "__main__":
+    print(f"Migrated {asyncio.run(migrate())} mappings")